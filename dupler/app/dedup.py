@@ -40,20 +40,70 @@ class DeDeplicate(App):
 
         self.fm = fm
         self.duplicates = duplicates
-        self.keys = [k for k in duplicates.keys()]
+        self._rebuild_keys()
+        self.hex_keys: dict[bytes, str] = {k: k.hex() for k in duplicates}
+        self.keys_by_hex: dict[str, bytes] = {v: k for k, v in self.hex_keys.items()}
         self.selection: dict[bytes, int] = {}
         self.reduced: dict[bytes, int] = {}
+        self._reduced_sum = 0
+        self._total_size: dict[bytes, int] = {}
+        self._file_size: dict[bytes, dict[int, int]] = {}
+        self._dirset: dict[bytes, frozenset[int]] = {}
+        self._by_dirset: dict[frozenset[int], list[bytes]] = {}
+        self._file_by_path: dict[bytes, dict[int, model.File]] = {}
+        self._file_by_id: dict[bytes, dict[int, model.File]] = {}
+        for hash in duplicates:
+            self._index_duplicate(hash)
         self.apply = False
         self.logs = LogScreen()
+        self._stats_dirty = False
+        self._populated: set[bytes] = set()
+        self._path_text: dict[int, Text] = {}
+        self._file_selects: dict[bytes, Select] = {}
+
+    def _rebuild_keys(self):
+        self.keys = list(self.duplicates)
+        self.key_index: dict[bytes, int] = {k: i for i, k in enumerate(self.keys)}
+
+    def _index_duplicate(self, hash: bytes):
+        files = self.duplicates[hash].files
+        sizes = {f.id: f.object.size for f in files}
+        self._file_size[hash] = sizes
+        self._total_size[hash] = sum(sizes.values())
+
+        self._unindex_dirset(hash)
+        dirset = frozenset(f.path_id for f in files)
+        self._dirset[hash] = dirset
+        self._by_dirset.setdefault(dirset, []).append(hash)
+        self._file_by_path[hash] = {f.path_id: f for f in reversed(files)}
+        self._file_by_id[hash] = {f.id: f for f in files}
+
+    def _unindex_dirset(self, hash: bytes):
+        dirset = self._dirset.pop(hash, None)
+        if dirset is None:
+            return
+        hashes = self._by_dirset[dirset]
+        hashes.remove(hash)
+        if len(hashes) == 0:
+            del self._by_dirset[dirset]
 
     def on_mount(self) -> None:
         self.install_screen(self.logs, name="log")
+        self._reduced_widget = self.query_one("#reduced", Digits)
+        self._processed_widget = self.query_one("#processed", Digits)
 
     def compose(self) -> ComposeResult:
         yield Header()
         with ListView(id="list"):
             cnt = 0
             for hash, duplicate in self.duplicates.items():
+                hex_key = self.hex_keys[hash]
+                select = Select(
+                    [],
+                    prompt="Select a file to keep",
+                    id=f"file-{hex_key}",
+                )
+                self._file_selects[hash] = select
                 yield ListItem(
                     HorizontalGroup(
                         Digits(f"{cnt+1}", classes="sn"),
@@ -63,14 +113,10 @@ class DeDeplicate(App):
                                 markup=False,
                                 classes="hash",
                             ),
-                            Select(
-                                self.options_for_files(duplicate.files),
-                                prompt="Select a file to keep",
-                                id=f"file-{hash.hex()}",
-                            ),
+                            select,
                         ),
                     ),
-                    id=f"item-{hash.hex()}",
+                    id=f"item-{hex_key}",
                     classes="list-item",
                 )
                 cnt += 1
@@ -83,9 +129,41 @@ class DeDeplicate(App):
             classes="bottom",
         )
 
+    def populate_select(self, hash: bytes) -> Select:
+        select = self._file_selects[hash]
+        if hash not in self._populated:
+            self._populated.add(hash)
+            files = self.duplicates[hash].files
+            with select.prevent(Select.Changed):
+                select.set_options(self.options_for_files(files))
+        return select
+
+    def hash_for_item(self, item: ListItem | None) -> Optional[bytes]:
+        id_str = item.id if item is not None else None
+        if id_str is None or not id_str.startswith("item-"):
+            return None
+        return self.keys_by_hex.get(id_str[len("item-") :])
+
+    def hash_for_select(self, select: Select) -> Optional[bytes]:
+        id_str = select.id or ""
+        if not id_str.startswith("file-"):
+            return None
+        return self.keys_by_hex.get(id_str[len("file-") :])
+
+    @on(ListView.Highlighted)
+    def on_highlight_item(self, event: ListView.Highlighted) -> None:
+        hash = self.hash_for_item(event.item)
+        if hash is not None:
+            self.populate_select(hash)
+
     @on(ListView.Selected)
     def on_select_item(self, event: ListView.Selected) -> None:
-        event.item.query_one(Select).action_show_overlay()
+        hash = self.hash_for_item(event.item)
+        if hash is not None:
+            select = self.populate_select(hash)
+        else:
+            select = event.item.query_one(Select)
+        select.action_show_overlay()
 
     def ask(self, question: str, action: Callable):
         dialog = Ask(question, action)
@@ -93,7 +171,14 @@ class DeDeplicate(App):
 
     def set_selection(self, hash: bytes, value: int):
         self.selection[hash] = value
-        self.reduced[hash] = self.calculate_reduced(hash)
+        self.set_reduced(hash, self.calculate_reduced(hash))
+
+    def set_reduced(self, hash: bytes, value: int):
+        self._reduced_sum += value - self.reduced.get(hash, 0)
+        self.reduced[hash] = value
+
+    def drop_reduced(self, hash: bytes):
+        self._reduced_sum -= self.reduced.pop(hash, 0)
 
     def action_next_new(self):
         lv = self.query_one("#list", ListView)
@@ -121,21 +206,19 @@ class DeDeplicate(App):
                 return
 
     def apply_for_directory_prefers(
-        self, origin: bytes, dir_id: int, dirset: set[int]
+        self, origin: bytes, dir_id: int, dirset: frozenset[int]
     ) -> Callable:
         def apply():
-            for hash, duplicate in self.duplicates.items():
+            for hash in self._by_dirset.get(dirset, []):
                 if hash == origin:
                     continue
-                dirset2 = {x.path_id for x in duplicate.files}
-                if dirset == dirset2:
-                    s = self.query_one(f"#file-{hash.hex()}", Select)
-                    if s.value == Select.BLANK:
-                        value = [x for x in duplicate.files if x.path_id == dir_id][0].id
-                        with s.prevent(Select.Changed):
-                            s.value = value
-                        self.set_selection(hash, value)
-            self.update_statics()
+                s = self.populate_select(hash)
+                if s.value == Select.BLANK:
+                    value = self._file_by_path[hash][dir_id].id
+                    with s.prevent(Select.Changed):
+                        s.value = value
+                    self.set_selection(hash, value)
+            self._schedule_stats_update()
 
         return apply
 
@@ -144,8 +227,8 @@ class DeDeplicate(App):
         names = [file.name for file in duplicate.files]
         name = names.pop(0)
         if all([name == x for x in names]):
-            prefer = [file.directory for file in duplicate.files if file.id == value][0]
-            dir_set = {file.path_id for file in duplicate.files}
+            prefer = self._file_by_id[hash][value].directory
+            dir_set = self._dirset[hash]
             self.ask(
                 f"Apply preference to {prefer.path} ",
                 self.apply_for_directory_prefers(hash, prefer.id, dir_set),
@@ -153,37 +236,52 @@ class DeDeplicate(App):
 
     @on(Select.Changed)
     def on_select_changed(self, event: Select.Changed) -> None:
-        id_str = event.select.id or ""
-        if not id_str.startswith("file-"):
+        hash = self.hash_for_select(event.select)
+        if hash is None:
             return
-        hash = bytes.fromhex(id_str[len("file-") :])
         value = event.select.value
         if isinstance(value, int) and value != Select.BLANK:
             self.set_selection(hash, value)
             self.try_generic(hash, value)
         else:
             del self.selection[hash]
-            del self.reduced[hash]
-        self.update_statics()
+            self.drop_reduced(hash)
+        self._schedule_stats_update()
+
+    def path_text(self, file: model.File) -> Text:
+        text = self._path_text.get(file.id)
+        if text is None:
+            text = Text(file.get_path())
+            self._path_text[file.id] = text
+        return text
 
-    @staticmethod
-    def options_for_files(files: list[model.File]):
+    def options_for_files(self, files: list[model.File]):
         return [
             (
-                Text(f.get_path()),
+                self.path_text(f),
                 f.id,
             )
             for f in files
         ]
 
     def calculate_reduced(self, hash) -> int:
-        id = self.selection[hash]
-        return sum(file.object.size for file in self.duplicates[hash] if file.id != id)
+        return self._total_size[hash] - self._file_size[hash][self.selection[hash]]
+
+    STATS_UPDATE_DELAY = 0.05
+
+    def _schedule_stats_update(self):
+        if self._stats_dirty:
+            return
+        self._stats_dirty = True
+        self.set_timer(self.STATS_UPDATE_DELAY, self._flush_stats)
+
+    def _flush_stats(self):
+        self._stats_dirty = False
+        self.update_statics()
 
     def update_statics(self):
-        reduced = sum(self.reduced.values())
-        self.query_one("#reduced", Digits).update(f"{reduced:,d}")
-        self.query_one("#processed", Digits).update(
+        self._reduced_widget.update(f"{self._reduced_sum:,d}")
+        self._processed_widget.update(
             f"{len(self.selection):,d} / {len(self.duplicates):,d}"
         )
 
@@ -195,39 +293,53 @@ class DeDeplicate(App):
     def do_apply(self):
         to_remove: list[bytes] = []
         to_update: list[bytes] = []
-        errors: list[str] = []
+        errors: list[Exception] = []
         for hash, id in self.selection.items():
-            removed: list[int] = []
-            for file in self.duplicates[hash]:
+            duplicate = self.duplicates[hash]
+            removed: set[int] = set()
+            for file in duplicate.files:
                 if file.id != id:
                     try:
                         self.fm.delete_file(file)
-                        removed.append(file.id)
+                        removed.add(file.id)
                     except Exception as e:
-                        errors.append(str(e))
+                        errors.append(e)
 
             if len(removed) == 0:
                 continue
 
-            new_files = [f for f in self.duplicates[hash] if f.id not in removed]
+            new_files = [f for f in duplicate.files if f.id not in removed]
             if len(new_files) == 1:
                 self.duplicates.pop(hash)
                 to_remove.append(hash)
             else:
-                self.duplicates[hash] = new_files
-                self.reduced[hash] = self.calculate_reduced(hash)
+                self.duplicates[hash] = duplicate._replace(files=new_files)
+                self._index_duplicate(hash)
+                self.set_reduced(hash, self.calculate_reduced(hash))
+                to_update.append(hash)
+
+        for e in errors:
+            self.logs.write(Text(str(e), style="red"))
 
         indexes = []
         for hash in to_remove:
-            indexes.append(self.keys.index(hash))
+            indexes.append(self.key_index[hash])
             self.selection.pop(hash)
+            self.drop_reduced(hash)
+            self._total_size.pop(hash, None)
+            self._file_size.pop(hash, None)
+            self._file_by_path.pop(hash, None)
+            self._file_by_id.pop(hash, None)
+            self._unindex_dirset(hash)
+            self._file_selects.pop(hash, None)
 
         view = self.query_one("#list", ListView)
         view.remove_items(indexes)
-        self.keys = [k for k in self.duplicates.keys()]
+        self._rebuild_keys()
 
         for hash in to_update:
-            selector = self.query_one("#file-" + hash.hex(), Select)
+            selector = self._file_selects[hash]
+            self._populated.add(hash)
             selector.set_options(self.options_for_files(self.duplicates[hash].files))
 
         self.update_statics()
@@ -235,5 +347,9 @@ class DeDeplicate(App):
     @on(DescendantFocus)
     def on_descendant_focus(self, event: DescendantFocus) -> None:
         if isinstance(event.widget, Select):
+            # clicking a Select focuses it without highlighting its row
+            hash = self.hash_for_select(event.widget)
+            if hash is not None:
+                self.populate_select(hash)
             lst = self.query_one("#list", ListView)
             lst.focus()
@@ -1,20 +1,92 @@
 import fnmatch
+from functools import cached_property
 import os
 from os import path
 import re
-from typing import Optional
+from typing import Optional, Protocol
 
 import click
 from pydantic import BaseModel
 
 from . import context
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class Settings(BaseModel):
     exclude_files: list[str] = []
     exclude_directories: list[str] = []
 
 
+class Matcher(Protocol):
+    def match(self, name: str) -> object: ...
+
+
+class HiddenMatcher:
+    def match(self, name: str) -> bool:
+        return name.startswith(".")
+
+
+class HyperscanMatcher:
+    def __init__(self, regexs: list[str], fallback: Matcher):
+        import hyperscan
+
+        self.__db = hyperscan.Database()
+        self.__db.compile(
+            expressions=[r.encode() for r in regexs],
+            flags=[
+                hyperscan.HS_FLAG_SINGLEMATCH
+                | hyperscan.HS_FLAG_DOTALL
+                | hyperscan.HS_FLAG_UTF8
+            ]
+            * len(regexs),
+        )
+        self.__fallback = fallback
+
+    def match(self, name: str) -> bool:
+        try:
+            data = name.encode("utf-8")
+        except UnicodeEncodeError:
+            # undecodable names aren't valid UTF-8, which HS_FLAG_UTF8 requires
+            return self.__fallback.match(name) is not None
+
+        matched = False
+
+        def on_match(*args) -> None:
+            # returning True would abort the scan with hyperscan.ScanTerminated
+            nonlocal matched
+            matched = True
+
+        self.__db.scan(data, match_event_handler=on_match)
+        return matched
+
+
+class Re2Matcher:
+    def __init__(self, regex: str, fallback: Matcher):
+        import re2
+
+        self.__pattern = re2.compile(regex)
+        self.__fallback = fallback
+
+    def match(self, name: str) -> object:
+        try:
+            return self.__pattern.match(name)
+        except UnicodeEncodeError:
+            # re2 encodes names to UTF-8, which surrogate-escaped bytes are not
+            return self.__fallback.match(name)
+
+
+def dfa_regex(regex: str) -> str:
+    # DFA engines don't support atomic groups, but they never backtrack either
+    regex = regex.replace("(?>", "(?:")
+    if regex.endswith(r"\Z"):
+        regex = regex[:-2] + r"\z"
+    return "^" + regex
+
+
 class Config:
     CONFIG_DIR = ".dupler"
     DATABASE_FILE = "database.sqlite3"
@@ -23,14 +95,17 @@ class Config:
     def __init__(self, base_dir):
         self.__base_dir = base_dir
         self.__data_dir = path.join(base_dir, self.CONFIG_DIR)
+        os.makedirs(self.__data_dir, exist_ok=True)
         setting_file = self.path_for(self.SETTINGS_FILE)
-        if os.path.exists(setting_file):
-            with open(setting_file, "rt") as f:
-                self.settings = Settings.model_validate_json(f.read())
-        else:
+        try:
+            with open(setting_file, "rb") as f:
+                data = f.read()
+            if orjson is not None:
+                self.settings = Settings.model_validate(orjson.loads(data))
+            else:
+                self.settings = Settings.model_validate_json(data)
+        except FileNotFoundError:
             self.settings = Settings()
-        self.__ex_files = None
-        self.__ex_dirs = None
 
     @property
     def base_dir(self) -> str:
@@ -45,62 +120,78 @@ class Config:
         return f"sqlite+pysqlite:///{self.path_for(self.DATABASE_FILE)}"
 
     def path_for(self, *names) -> str:
-        p = path.join(self.__data_dir, *names)
-        dir = path.dirname(p)
-        if not path.exists(dir):
-            os.makedirs(dir)
-        return p
+        return path.join(self.__data_dir, *names)
 
     @staticmethod
-    def regex_for_patterns(patterns: list[str]) -> re.Pattern:
+    def regex_for_patterns(patterns: list[str]) -> Matcher:
         regexs = [fnmatch.translate(pat) for pat in patterns]
-        return re.compile("^(" + "|".join(regexs) + ")$")
-
-    def regex_ex_files(self) -> re.Pattern:
-        if self.__ex_files is None:
-            self.__ex_files = self.regex_for_patterns(self.settings.exclude_files)
-        return self.__ex_files
-
-    def regex_ex_dirs(self) -> re.Pattern:
-        if self.__ex_dirs is None:
-            self.__ex_dirs = self.regex_for_patterns(self.settings.exclude_directories)
-        return self.__ex_dirs
+        regex = re.compile("(?:" + "|".join(regexs) + r")\Z")
+        try:
+            return HyperscanMatcher([dfa_regex(r) for r in regexs], regex)
+        except Exception:
+            pass
+        try:
+            return Re2Matcher("|".join(dfa_regex(r) for r in regexs), regex)
+        except Exception:
+            pass
+        return regex
+
+    HIDDEN_PATTERN = ".*"
+
+    @cached_property
+    def regex_ex_files(self) -> Matcher:
+        if not self.settings.exclude_files:
+            return HiddenMatcher()
+        return self.regex_for_patterns(
+            [self.HIDDEN_PATTERN, *self.settings.exclude_files]
+        )
+
+    @cached_property
+    def regex_ex_dirs(self) -> Matcher:
+        if not self.settings.exclude_directories:
+            # CONFIG_DIR is hidden as well
+            return HiddenMatcher()
+        return self.regex_for_patterns(
+            [self.HIDDEN_PATTERN, self.CONFIG_DIR, *self.settings.exclude_directories]
+        )
 
     def add_exclude_file(self, pattern: str):
         self.settings.exclude_files.append(pattern)
-        self.__ex_files = None
+        self.__dict__.pop("regex_ex_files", None)
 
     def remove_exclude_file(self, pattern: str):
+        if pattern not in self.settings.exclude_files:
+            return
         self.settings.exclude_files.remove(pattern)
-        self.__ex_files = None
+        self.__dict__.pop("regex_ex_files", None)
 
     def add_exclude_dir(self, pattern: str):
         self.settings.exclude_directories.append(pattern)
-        self.__ex_dirs = None
+        self.__dict__.pop("regex_ex_dirs", None)
 
     def remove_exclude_dir(self, pattern: str):
+        if pattern not in self.settings.exclude_directories:
+            return
         self.settings.exclude_directories.remove(pattern)
-        self.__ex_dirs = None
+        self.__dict__.pop("regex_ex_dirs", None)
 
     def is_valid_file(self, name: str) -> bool:
-        if name.startswith("."):
-            return False
-        if self.regex_ex_files().match(name):
-            return False
-        return True
+        return not self.regex_ex_files.match(name)
 
     def is_valid_directory(self, name: str) -> bool:
-        if name == Config.CONFIG_DIR:
-            return False
-        if name.startswith("."):
-            return False
-        if self.regex_ex_dirs().match(name):
-            return False
-        return True
+        return not self.regex_ex_dirs.match(name)
 
     def save(self):
-        with open(self.path_for(self.SETTINGS_FILE), "wt") as f:
-            f.write(self.settings.model_dump_json(indent=2, exclude_defaults=True))
+        if orjson is not None:
+            data = orjson.dumps(
+                self.settings.model_dump(exclude_defaults=True),
+                option=orjson.OPT_INDENT_2,
+            )
+        else:
+            data = self.settings.model_dump_json(indent=2, exclude_defaults=True)
+            data = data.encode()
+        with open(self.path_for(self.SETTINGS_FILE), "wb") as f:
+            f.write(data)
 
     @classmethod
     def has_config(cls, dir: str) -> bool:
@@ -121,16 +212,24 @@ def init(dir: Optional[str] = None):
     Config.init_dir(dir or ".")
 
 
+_ROOT_CACHE: dict[str, str] = {}
+
+
 def get_instance() -> Config:
     def create_config() -> Config:
-        base_dir = path.realpath(path.curdir)
+        cwd = os.getcwd()
+        if cwd in _ROOT_CACHE:
+            return Config(_ROOT_CACHE[cwd])
+        base_dir = path.realpath(cwd)
         while True:
             if Config.has_config(base_dir):
                 try:
-                    return Config(base_dir)
+                    cfg = Config(base_dir)
+                    _ROOT_CACHE[cwd] = base_dir
+                    return cfg
                 except:
                     pass
-            if base_dir == "/":
+            if path.ismount(base_dir):
                 break
             base_dir = path.dirname(base_dir)
         raise NoConfigError("No config found")
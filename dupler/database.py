@@ -1,16 +1,66 @@
 import sqlalchemy
-from sqlalchemy import orm, engine
+from sqlalchemy import orm, engine, event
 
-from . import config, model, context
+from . import config, hashing, model, context
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def set_sqlite_pragmas(dbapi_conn, connection_record) -> None:
+    cursor = dbapi_conn.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def add_missing_columns(conn: engine.Connection) -> None:
+    # create_all() never alters existing tables, so add new nullable columns
+    inspector = sqlalchemy.inspect(conn)
+    for table in model.Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+            )
 
 
 class Database:
     def __init__(self, url: str) -> None:
-        self.__engine = sqlalchemy.create_engine(url)
-        model.Base.metadata.create_all(self.__engine)
+        self.__engine = sqlalchemy.create_engine(
+            url, connect_args={"check_same_thread": False}
+        )
+        event.listen(self.__engine, "connect", set_sqlite_pragmas)
+        with self.__engine.begin() as conn:
+            version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+            if version != model.SCHEMA_VERSION:
+                fresh = not sqlalchemy.inspect(conn).has_table(
+                    model.Object.__tablename__
+                )
+                model.Base.metadata.create_all(conn)
+                if fresh:
+                    # only databases that predate the property lack it
+                    conn.execute(
+                        sqlalchemy.insert(model.Property).values(
+                            key="hash_algorithm", value=hashing.HASH_ALGORITHM
+                        )
+                    )
+                add_missing_columns(conn)
+                # create_all() skips indexes added to tables that already exist
+                for table in model.Base.metadata.sorted_tables:
+                    for index in table.indexes:
+                        index.create(conn, checkfirst=True)
+                conn.exec_driver_sql(f"PRAGMA user_version = {model.SCHEMA_VERSION}")
+        self.__Session = orm.sessionmaker(bind=self.__engine, expire_on_commit=False)
 
     def session(self, **kwargs) -> orm.Session:
-        return orm.Session(self.__engine, **kwargs)
+        return self.__Session(**kwargs)
 
     def dispose(self) -> None:
         self.__engine.dispose()
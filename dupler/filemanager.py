@@ -1,7 +1,16 @@
 import enum
+import functools
+import multiprocessing
 import os
 import stat
-from typing import Callable, Generator, NamedTuple, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import (
+    Callable,
+    Collection,
+    Generator,
+    NamedTuple,
+    Optional,
+)
 
 from rich.console import Console, Group
 from rich.live import Live
@@ -14,9 +23,9 @@ from rich.progress import (
     TextColumn,
     TimeRemainingColumn,
 )
-from sqlalchemy import delete, func, orm, select, update
+from sqlalchemy import delete, exists, func, insert, or_, orm, select, update
 
-from . import config, database, model
+from . import config, database, hashing, model
 
 
 class TaskType(enum.Enum):
@@ -151,40 +160,49 @@ class Duplicate(NamedTuple):
     hash: bytes
     files: list[model.File]
 
+
 class FileManager:
     def __init__(self, out: Console, conn: orm.Session, config: config.Config):
         self.out = out
         self.conn = conn
         self.config = config
         self.base_dir = config.base_dir
+        self._pending_writes = 0
+        self._dev_prefixes: dict[int, str] = {}
+        # names like .DS_Store or node_modules repeat across directories
+        self._valid_directory = functools.lru_cache(maxsize=self.NAME_CACHE_SIZE)(
+            config.is_valid_directory
+        )
+        self._valid_file = functools.lru_cache(maxsize=self.NAME_CACHE_SIZE)(
+            config.is_valid_file
+        )
 
     def progress(self) -> TaskManager:
         return TaskManager(console=self.out)
 
+    COMMIT_INTERVAL = 1000
+    SQL_BATCH_SIZE = 1000
+
+    def note_write(self):
+        self._pending_writes += 1
+        if self._pending_writes >= self.COMMIT_INTERVAL:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self._pending_writes = 0
+
+    NAME_CACHE_SIZE = 8192
+
     def is_valid_directory(self, name: str) -> bool:
-        return self.config.is_valid_directory(name)
+        return self._valid_directory(name)
 
     def is_valid_file(self, name: str) -> bool:
-        return self.config.is_valid_file(name)
+        return self._valid_file(name)
 
     BLOCK_SIZE = 1024 * 1024
 
-    def calculate_hash(self, ptask: Task, root: str, file: str) -> bytes:
-        import hashlib
-
-        hasher = hashlib.sha256()
-        with open(os.path.join(root, file), "rb") as f:
-            st = os.fstat(f.fileno())
-            with ptask.tm.create_task(
-                TaskType.FILE,
-                f"Hash [blue]{escape(file)}[/]",
-                st.st_size,
-                transient=True,
-            ) as progress:
-                while read := f.read(1024 * 1024):
-                    hasher.update(read)
-                    progress.advance(len(read))
-                return hasher.digest()
+    PREFIX_SIZE = 64 * 1024
 
     def get_directory(self, path: str) -> Optional[model.Directory]:
         return self.conn.scalar(
@@ -202,21 +220,29 @@ class FileManager:
             self.conn.add(dir)
         return dir
 
-    @staticmethod
-    def oid_of(st: os.stat_result) -> str:
-        return f"{st.st_dev}:{st.st_ino}"
+    def oid_of(self, st: os.stat_result) -> str:
+        prefix = self._dev_prefixes.get(st.st_dev)
+        if prefix is None:
+            prefix = self._dev_prefixes[st.st_dev] = f"{st.st_dev}:"
+        return prefix + str(st.st_ino)
 
     def ensure_object(
         self,
         st: os.stat_result,
         get_hash: Optional[Callable[[], bytes]] = None,
         obj: Optional[model.Object] = None,
+        known: Optional[dict[str, model.Object]] = None,
+        oid: Optional[str] = None,
     ) -> model.Object | None:
         if not stat.S_ISREG(st.st_mode):
             return None
-        oid = self.oid_of(st)
+        if oid is None:
+            oid = self.oid_of(st)
         if obj is None or obj.id != oid:
-            obj = self.conn.get(model.Object, oid)
+            if known is not None:
+                obj = known.get(oid)
+            else:
+                obj = self.conn.get(model.Object, oid)
         if obj is None:
             hash = get_hash() if get_hash else None
             obj = model.Object(
@@ -226,59 +252,66 @@ class FileManager:
                 hash=hash,
             )
             self.conn.add(obj)
-            if hash is not None:
-                self.conn.commit()
+            if known is not None:
+                known[oid] = obj
+            self.note_write()
         else:
-            if (
-                obj.modified != st.st_mtime
-                or obj.size != st.st_size
-                or obj.hash is None
-            ):
+            changed = obj.modified != st.st_mtime or obj.size != st.st_size
+            if changed or obj.hash is None:
                 if get_hash:
                     hash = get_hash()
                     self.out.print(f"Calculated id={obj.id} hash={hash.hex()}")
                 else:
                     hash = None
-                obj = self.conn.scalars(
-                    update(model.Object)
-                    .where(
-                        model.Object.id == obj.id,
-                    )
-                    .values(
-                        modified=st.st_mtime,
-                        size=st.st_size,
-                        hash=hash,
-                    )
-                    .returning(model.Object)
-                ).one()
-                if hash is not None:
-                    self.conn.commit()
+                obj.modified = st.st_mtime
+                obj.size = st.st_size
+                obj.hash = hash
+                if changed:
+                    obj.prefix_hash = None
+                self.note_write()
         return obj
 
-    def update_file(self, file: model.File, object_id: str | None):
-        if file.object_id != object_id:
-            file = self.conn.scalars(
-                update(model.File)
-                .where(
-                    model.File.id == file.id,
-                )
-                .values(
-                    object_id=object_id,
-                )
-                .returning(model.File)
-            ).one()
-        return file
-
     def delete_directory(self, dirname: str):
         self.conn.query(model.Directory).filter(
             model.Directory.path == dirname,
         ).delete()
 
+    def delete_removed_children(
+        self, dir: model.Directory, dirname: str, dirs: list[str]
+    ):
+        present = {os.path.join(dirname, d) if dirname != "." else d for d in dirs}
+        removed = [
+            id
+            for id, path in self.conn.execute(
+                select(model.Directory.id, model.Directory.path).where(
+                    model.Directory.parent_id == dir.id,
+                )
+            )
+            if path not in present
+        ]
+        # Core deletes skip the ORM cascade, so collect whole subtrees through
+        # parent_id; matching paths by LIKE would ignore ASCII case
+        child = orm.aliased(model.Directory)
+        for i in range(0, len(removed), self.SQL_BATCH_SIZE):
+            subtree = (
+                select(model.Directory.id)
+                .where(model.Directory.id.in_(removed[i : i + self.SQL_BATCH_SIZE]))
+                .cte("subtree", recursive=True, nesting=True)
+            )
+            subtree = subtree.union(
+                select(child.id).join(subtree, child.parent_id == subtree.c.id)
+            )
+            ids = select(subtree.c.id)
+            self.conn.execute(delete(model.File).where(model.File.path_id.in_(ids)))
+            self.conn.execute(
+                delete(model.Directory).where(model.Directory.id.in_(ids))
+            )
+
     def delete_dangled_objects(self):
         self.conn.flush()
         n = (
             self.conn.query(model.Object)
-            .filter(model.Object.id.not_in(select(model.File.object_id)))
+            .filter(~exists().where(model.File.object_id == model.Object.id))
             .delete()
         )
         if n > 0:
@@ -288,12 +321,15 @@ class FileManager:
         self.conn.flush()
         n = (
             self.conn.query(model.File)
-            .filter(model.File.object_id.not_in(select(model.Object.id)))
+            .filter(
+                model.File.object_id.is_not(None),
+                ~exists().where(model.Object.id == model.File.object_id),
+            )
             .delete()
         )
         n += (
             self.conn.query(model.File)
-            .filter(model.File.path_id.not_in(select(model.Directory.id)))
+            .filter(~exists().where(model.Directory.id == model.File.path_id))
             .delete()
         )
         if n > 0:
@@ -301,24 +337,65 @@ class FileManager:
 
     def delete_dangled_directories(self):
         self.conn.flush()
-        while True:
-            n = (
-                self.conn.query(model.Directory)
-                .filter(model.Directory.parent_id.not_in(select(model.Directory.id)))
-                .delete()
-            )
-            if n == 0:
-                break
+        reachable = (
+            select(model.Directory.id)
+            .where(model.Directory.parent_id.is_(None))
+            .cte("reachable", recursive=True, nesting=True)
+        )
+        child = orm.aliased(model.Directory)
+        reachable = reachable.union(
+            select(child.id).join(reachable, child.parent_id == reachable.c.id)
+        )
+        n = (
+            self.conn.query(model.Directory)
+            .filter(model.Directory.id.not_in(select(reachable.c.id)))
+            .delete(synchronize_session=False)
+        )
+        if n > 0:
             self.out.print(f"Deleted {n} dangled Directories")
 
-    def scan_directory(self, ptask: Task, root: str, dirs: list[str], files: list[str]):
+    @staticmethod
+    def walk(
+        top: str,
+    ) -> Generator[tuple[str, list[os.DirEntry], list[os.DirEntry]], None, None]:
+        # Like os.walk(top), but keeps the DirEntry objects so their stat
+        # results can be reused; prune by modifying the yielded dirs in place.
+        stack = [top]
+        while stack:
+            root = stack.pop()
+            try:
+                with os.scandir(root) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            dirs: list[os.DirEntry] = []
+            files: list[os.DirEntry] = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                (dirs if is_dir else files).append(entry)
+            yield root, dirs, files
+            stack.extend(
+                entry.path for entry in reversed(dirs) if not entry.is_symlink()
+            )
+
+    def scan_directory(
+        self,
+        ptask: Task,
+        root: str,
+        dirs: list[os.DirEntry],
+        files: list[os.DirEntry],
+        quick: bool = False,
+    ):
         dirname = os.path.relpath(root, self.base_dir)
 
         if dirname == ".":
             pdirname = None
         else:
             pdirname = os.path.relpath(os.path.dirname(root), self.base_dir)
-            if config.Config.CONFIG_DIR in dirs:
+            if any(x.name == config.Config.CONFIG_DIR for x in dirs):
                 try:
                     cfg = config.Config(root)
                     db = database.Database(cfg.database_url)
@@ -327,8 +404,8 @@ class FileManager:
                 except BaseException as e:
                     self.out.print(f"Failed to import config: {e!r}")
 
-        dirs[:] = [x for x in dirs if self.is_valid_directory(x)]
-        files = [x for x in files if self.is_valid_file(x)]
+        dirs[:] = [x for x in dirs if self.is_valid_directory(x.name)]
+        files = [x for x in files if self.is_valid_file(x.name)]
 
         ptask.add_total(len(dirs), len(files))
 
@@ -339,60 +416,98 @@ class FileManager:
             pdir = None
 
         dir = self.ensure_directory(dirname, pdir)
-
-        for cdir in dir.children:
-            pname = os.path.relpath(cdir.path, dirname)
-            if pname not in dirs:
-                self.conn.delete(cdir)
-        self.conn.commit()
+        mtime = os.stat(root).st_mtime_ns
+        if quick and dir.mtime == mtime:
+            # entries are unchanged, but files edited in place are missed
+            ptask.advance(len(files) + 1)
+            return
+        if dir.id is not None:
+            self.delete_removed_children(dir, dirname, [x.name for x in dirs])
 
         if len(files) == 0:
+            dir.mtime = mtime
+            self.commit()
             ptask.advance()
             return
+        self.commit()
 
-        files.sort()
+        files.sort(key=lambda x: x.name)
         with ptask.create_task(
             TaskType.DIRECTORY,
             f"Scan files at [blue]{escape(dirname)}[/]",
             len(files),
             transient=True,
         ) as task:
-            self.scan_files(task, root, dir, files)
-            self.conn.commit()
+            self.scan_files(task, dir, files)
+            # record the mtime only once the whole directory is committed
+            dir.mtime = mtime
+            self.commit()
             self.out.print(
                 f"Scan {task.total:>,d} files at [blue]{escape(dirname)}[/] - [right][green]DONE[/][/]"
             )
 
-    def scan_files(self, task: Task, root: str, dir: model.Directory, files: list[str]):
-        db_files = self.conn.scalars(
-            select(model.File)
+    def load_objects(self, oids: Collection[str]) -> dict[str, model.Object]:
+        oids = list(oids)
+        objects: dict[str, model.Object] = {}
+        for i in range(0, len(oids), self.SQL_BATCH_SIZE):
+            for obj in self.conn.scalars(
+                select(model.Object).where(
+                    model.Object.id.in_(oids[i : i + self.SQL_BATCH_SIZE])
+                )
+            ):
+                objects[obj.id] = obj
+        return objects
+
+    def scan_files(self, task: Task, dir: model.Directory, files: list[os.DirEntry]):
+        entries = {x.name: x for x in files}
+        db_files = self.conn.execute(
+            select(model.File, model.Object)
+            .outerjoin(model.File.object)
             .where(model.File.path_id == dir.id)
             .order_by(model.File.name)
         ).all()
 
-        for db_file in db_files:
-            if db_file.name not in files:
-                self.conn.delete(db_file)
-            else:
-                st = os.lstat(os.path.join(root, db_file.name))
-                obj = self.ensure_object(st, obj=db_file.object)
-                self.update_file(db_file, obj.id if obj else None)
-                files.remove(db_file.name)
-                task.advance()
+        self.delete_file_rows([f.id for f, _ in db_files if f.name not in entries])
+
+        stats = {name: x.stat(follow_symlinks=False) for name, x in entries.items()}
+        oids = {
+            name: self.oid_of(st)
+            for name, st in stats.items()
+            if stat.S_ISREG(st.st_mode)
+        }
+        known = {o.id: o for _, o in db_files if o is not None}
+        known.update(
+            self.load_objects({oid for oid in oids.values() if oid not in known})
+        )
+
+        for db_file, db_obj in db_files:
+            if entries.pop(db_file.name, None) is None:
+                continue
+            st = stats[db_file.name]
+            obj = self.ensure_object(
+                st, obj=db_obj, known=known, oid=oids.get(db_file.name)
+            )
+            db_file.object_id = obj.id if obj else None
+            task.advance()
 
-        for filename in files:
-            st = os.lstat(os.path.join(root, filename))
-            obj = self.ensure_object(st)
-            file = model.File(
-                path_id=dir.id,
-                name=filename,
-                type=st.st_mode,
-                object_id=(obj.id if obj else None),
+        new_rows: list[dict] = []
+        for filename in entries:
+            st = stats[filename]
+            obj = self.ensure_object(st, known=known, oid=oids.get(filename))
+            new_rows.append(
+                {
+                    "path_id": dir.id,
+                    "name": filename,
+                    "type": st.st_mode,
+                    "object_id": (obj.id if obj else None),
+                }
             )
-            self.conn.add(file)
             task.advance()
 
-    def scan(self):
+        if len(new_rows) > 0:
+            self.conn.execute(insert(model.File), new_rows)
+
+    def scan(self, quick: bool = False):
         with self.progress().create_task(
             TaskType.ROOT,
             f"Scan objects in [blue]{escape(self.base_dir)}[/]",
@@ -400,8 +515,16 @@ class FileManager:
             transient=True,
         ) as task:
             try:
-                for root, dirs, files in os.walk(self.base_dir):
-                    self.scan_directory(task, root, dirs, files)
+                for root, dirs, files in self.walk(self.base_dir):
+                    try:
+                        self.scan_directory(task, root, dirs, files, quick)
+                    except OSError as e:
+                        # earlier directories are committed; skip this subtree
+                        self.conn.rollback()
+                        dirs.clear()
+                        self.out.print(
+                            f"Failed to scan [blue]{escape(root)}[/]: [red]{escape(repr(e))}[/]"
+                        )
                 self.delete_dangled_objects()
                 self.conn.commit()
                 self.out.rule(
@@ -411,6 +534,31 @@ class FileManager:
                 self.conn.rollback()
                 raise
 
+    def check_hash_algorithm(self):
+        prop = self.conn.get(model.Property, "hash_algorithm")
+        if prop is not None and prop.value == hashing.HASH_ALGORITHM:
+            return
+        # databases without the property were always hashed with SHA-256
+        previous = prop.value if prop is not None else "sha256"
+        if previous != hashing.HASH_ALGORITHM:
+            n = self.conn.execute(
+                update(model.Object)
+                .where(
+                    or_(
+                        model.Object.hash.is_not(None),
+                        model.Object.prefix_hash.is_not(None),
+                    )
+                )
+                .values(hash=None, prefix_hash=None)
+            ).rowcount
+            if n > 0:
+                self.out.print(f"Reset {n} Objects hashed with {previous}")
+        if prop is None:
+            prop = model.Property(key="hash_algorithm")
+            self.conn.add(prop)
+        prop.value = hashing.HASH_ALGORITHM
+        self.conn.commit()
+
     def find_duplicates(self) -> dict[bytes, Duplicate]:
         items = self.conn.execute(
             select(model.File, model.Object)
@@ -425,27 +573,43 @@ class FileManager:
             .order_by(model.Object.size, model.Object.hash)
         ).all()
 
+        self.check_hash_algorithm()
         with self.progress().create_task(
             TaskType.ROOT,
             f"Scan duplicates in [blue]{escape(self.base_dir)}[/]",
             len(items),
             transient=True,
         ) as task:
+            paths: dict[model.Object, str] = {}
+            for file, obj in items:
+                paths.setdefault(obj, file.get_path())
+
+            # Bucket by the hash of the first PREFIX_SIZE bytes and read the
+            # whole file only when another object shares its size and prefix.
+            self.hash_objects(
+                task,
+                {o: p for o, p in paths.items() if o.prefix_hash is None},
+                prefix=True,
+            )
+            buckets: dict[tuple[int, bytes], int] = {}
+            for obj in paths:
+                key = (obj.size, obj.prefix_hash)
+                buckets[key] = buckets.get(key, 0) + 1
+            candidates = {
+                obj: path
+                for obj, path in paths.items()
+                if buckets[(obj.size, obj.prefix_hash)] > 1
+            }
+            self.hash_objects(
+                task, {o: p for o, p in candidates.items() if o.hash is None}
+            )
+
             duplicates: dict[bytes, Duplicate] = {}
             for file, obj in items:
+                task.advance()
+                if obj not in candidates:
+                    continue
                 hash = obj.hash
-                if hash is None:
-                    hash = self.calculate_hash(
-                        task,
-                        self.base_dir,
-                        file.get_path(),
-                    )
-                    self.conn.execute(
-                        update(model.Object)
-                        .where(model.Object.id == obj.id)
-                        .values(hash=hash)
-                    )
-                    self.conn.commit()
                 if hash not in duplicates:
                     duplicates[hash] = Duplicate(
                         name=file.name,
@@ -454,12 +618,74 @@ class FileManager:
                         files=[],
                     )
                 duplicates[hash].files.append(file)
-                task.advance()
             duplicates = {k: v for k, v in duplicates.items() if len(v.files) > 1}
             return duplicates
 
-    def delete_file(self, file: model.File):
+    # prefix reads are small and I/O bound; whole files use one process per CPU
+    PREFIX_HASH_WORKERS = 8
+
+    def hash_objects(
+        self, task: Task, paths: dict[model.Object, str], *, prefix: bool = False
+    ):
+        if len(paths) == 0:
+            return
+        if prefix:
+            # prefixes are small reads, not worth shipping to another process
+            calculate = functools.partial(hashing.hash_prefix, size=self.PREFIX_SIZE)
+            pool = ThreadPoolExecutor(
+                max_workers=min(len(paths), self.PREFIX_HASH_WORKERS)
+            )
+            name = "Hash prefixes:"
+        else:
+            calculate = functools.partial(hashing.hash_file, block_size=self.BLOCK_SIZE)
+            # forking would inherit hasher thread pools (blake3) in a bad state
+            pool = ProcessPoolExecutor(
+                max_workers=min(len(paths), os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            name = "Hash objects:"
+
+        rows: list[dict] = []
+        try:
+            with task.tm.create_task(
+                TaskType.DIRECTORY, name, len(paths), transient=True
+            ) as htask:
+                futures = {
+                    pool.submit(calculate, os.path.join(self.base_dir, path)): obj
+                    for obj, path in paths.items()
+                }
+                for future in as_completed(futures):
+                    obj = futures[future]
+                    if not prefix:
+                        values = {"hash": future.result()}
+                    else:
+                        hash, whole = future.result()
+                        if whole:
+                            values = {"prefix_hash": hash, "hash": hash}
+                        else:
+                            values = {"prefix_hash": hash}
+                    for key, value in values.items():
+                        orm.attributes.set_committed_value(obj, key, value)
+                    rows.append({"id": obj.id, **values})
+                    if len(rows) >= self.SQL_BATCH_SIZE:
+                        self.write_hashes(rows)
+                        rows = []
+                    htask.advance()
+        except BaseException:
+            # on Ctrl-C, don't run every queued job before stopping
+            pool.shutdown(cancel_futures=True)
+            raise
+        finally:
+            pool.shutdown()
+            self.write_hashes(rows)
+
+    def write_hashes(self, rows: list[dict]):
+        if len(rows) == 0:
+            return
+        self.conn.execute(update(model.Object), rows)
         self.conn.commit()
+
+    def delete_file(self, file: model.File):
         self.conn.execute(delete(model.File).where(model.File.id == file.id))
         try:
             full_path = os.path.join(self.base_dir, file.get_path())
@@ -471,19 +697,36 @@ class FileManager:
             raise
         self.conn.commit()
 
+    def delete_file_rows(self, ids: list[int]):
+        for i in range(0, len(ids), self.SQL_BATCH_SIZE):
+            self.conn.execute(
+                delete(model.File).where(
+                    model.File.id.in_(ids[i : i + self.SQL_BATCH_SIZE])
+                )
+            )
+
     def remove_duplicates(
-        self, duplicates: dict[bytes, list[model.File]], selection: dict[bytes, int]
+        self, duplicates: dict[bytes, Duplicate], selection: dict[bytes, int]
     ):
         with self.progress().create_task(
             TaskType.ROOT, f"Remove Duplicates", len(selection)
         ) as task:
-            for hash, id in selection.items():
-                for file in duplicates[hash]:
-                    if file.id != id:
-                        self.delete_file(file)
-                        task.advance()
-            self.delete_dangled_objects()
-            self.conn.commit()
+            removed: list[int] = []
+            try:
+                for hash, id in selection.items():
+                    for file in duplicates[hash].files:
+                        if file.id != id:
+                            try:
+                                os.remove(os.path.join(self.base_dir, file.get_path()))
+                            except FileNotFoundError:
+                                pass
+                            removed.append(file.id)
+                            task.advance()
+            finally:
+                # keep the index in sync with whatever was unlinked
+                self.delete_file_rows(removed)
+                self.delete_dangled_objects()
+                self.conn.commit()
 
     def import_objects(self, task: Task, db: database.Database, dirname: str):
         self.conn.flush()
@@ -505,6 +748,11 @@ class FileManager:
             if total == 0:
                 return
             self.out.print(f"Importing {total} Objects")
+            prop = conn.get(model.Property, "hash_algorithm")
+            # fingerprints from another algorithm never match ours, so drop them
+            same_algorithm = (
+                prop.value if prop else "sha256"
+            ) == hashing.HASH_ALGORITHM
             objects = conn.scalars(
                 select(model.Object).where(model.Object.id.not_in(object_ids))
             )
@@ -516,22 +764,22 @@ class FileManager:
                         id=obj.id,
                         size=obj.size,
                         modified=obj.modified,
-                        hash=obj.hash,
+                        hash=obj.hash if same_algorithm else None,
+                        prefix_hash=obj.prefix_hash if same_algorithm else None,
                     )
                     self.conn.add(nobj)
                     task.advance()
 
     def find_files(self, key: str) -> Generator[tuple[str, str, int], None, None]:
         skey = key if "%" in key else f"%{key}%"
-        items = self.conn.scalars(
-            select(model.File)
-            .join(model.Object)
-            .join(model.Directory)
+        rows = self.conn.execute(
+            select(model.File.name, model.Directory.path, model.Object.size)
+            .select_from(model.File)
+            .join(model.File.object)
+            .join(model.File.directory)
             .where(model.File.name.like(skey))
             .order_by(model.Directory.path, model.File.name)
+            .execution_options(yield_per=self.SQL_BATCH_SIZE)
         )
-        for file in items:
-            name = file.name
-            path = file.directory.path
-            size = file.object.size
-            yield name, path, size
+        for row in rows:
+            yield row.tuple()
@@ -0,0 +1,49 @@
+import hashlib
+import mmap
+import os
+from typing import Any, Callable
+
+
+def _new_hasher_factory() -> tuple[str, Callable[..., Any]]:
+    try:
+        import blake3
+
+        # single-threaded: whole files are already hashed one per process
+        return "blake3", blake3.blake3
+    except ImportError:
+        pass
+    return "sha256", hashlib.sha256
+
+
+HASH_ALGORITHM, new_hasher = _new_hasher_factory()
+
+
+def hash_prefix(path: str, size: int) -> tuple[bytes, bool]:
+    # read one byte more to tell whether the prefix is the whole file as it
+    # is now; the size recorded at scan time may be stale
+    with open(path, "rb") as f:
+        data = f.read(size + 1)
+    return new_hasher(data[:size]).digest(), len(data) <= size
+
+
+READAHEAD_BLOCKS = 4
+
+
+def hash_file(path: str, block_size: int) -> bytes:
+    hasher = new_hasher()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hasher.digest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            willneed = getattr(mmap, "MADV_WILLNEED", None)
+            with memoryview(mm) as mv:
+                for off in range(0, len(mv), block_size):
+                    if willneed is not None:
+                        # queue only the next few blocks, not the whole file,
+                        # so parallel workers don't flush the page cache
+                        mm.madvise(willneed, off, block_size * READAHEAD_BLOCKS)
+                    with mv[off : off + block_size] as block:
+                        hasher.update(block)
+    return hasher.digest()
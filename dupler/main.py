@@ -27,7 +27,13 @@ def init(dir: str | None = None):
 
 
 @main.command("scan")
-def scan():
+@click.option(
+    "--quick",
+    "-q",
+    is_flag=True,
+    help="Skip directories whose modification time is unchanged",
+)
+def scan(quick: bool):
     """
     Scan objects under the directory
     """
@@ -44,7 +50,7 @@ def scan():
     db = database.get_database()
     with db.session() as conn:
         s = filemanager.FileManager(out, conn, cfg)
-        s.scan()
+        s.scan(quick)
 
 
 @main.command("dedup")
@@ -3,17 +3,27 @@ from typing import Optional
 from sqlalchemy import *
 from sqlalchemy.orm import *
 
+SCHEMA_VERSION = 5
+
 
 class Base(DeclarativeBase):
     pass
 
 
+class Property(Base):
+    __tablename__ = "properties"
+
+    key: Mapped[str] = mapped_column(String(80), primary_key=True)
+    value: Mapped[str] = mapped_column(String(1024))
+
+
 class Directory(Base):
     __tablename__ = "directories"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     path: Mapped[str] = mapped_column(String(1024))
     parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("directories.id"))
+    mtime: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
 
     __table_args__ = (UniqueConstraint("path"),)
 
@@ -39,6 +49,9 @@ class Object(Base):
     size: Mapped[int] = mapped_column(BigInteger)
     modified: Mapped[int] = mapped_column(BigInteger)
     hash: Mapped[Optional[bytes]] = mapped_column(BINARY(32), nullable=True)
+    prefix_hash: Mapped[Optional[bytes]] = mapped_column(BINARY(32), nullable=True)
+
+    __table_args__ = (Index("ix_objects_size_hash", "size", "hash"),)
 
     files: Mapped[list["File"]] = relationship(
         back_populates="object",
@@ -65,7 +78,10 @@ class File(Base):
         back_populates="files",
     )
 
-    __table_args__ = (UniqueConstraint("path_id", "name"),)
+    __table_args__ = (
+        UniqueConstraint("path_id", "name"),
+        Index("ix_files_object_id", "object_id"),
+    )
 
     def __repr__(self):
         return f"File(path_id={self.path_id!r}, name={self.name!r}, type={self.type!r}, object_id={self.object_id!r})"